@@ -0,0 +1,156 @@
+"""Hot propagation loops, kept free of object and attribute dispatch.
+
+Everything here operates directly on the board's flat value list and
+candidate-mask array so the inner loops only touch local ints and
+sequence indexing. Callers that need to rewind take a board snapshot
+before propagating; only the indices of changed cells are reported back.
+"""
+
+from typing import List, Tuple
+
+
+def _build_peers() -> Tuple[Tuple[int, ...], ...]:
+    peers = []
+    for i in range(81):
+        row, column = divmod(i, 9)
+        box_row, box_column = row - row % 3, column - column % 3
+        shared = {row * 9 + k for k in range(9)} \
+            | {k * 9 + column for k in range(9)} \
+            | {(box_row + k // 3) * 9 + box_column + k % 3 for k in range(9)}
+        shared.discard(i)
+        peers.append(tuple(sorted(shared)))
+    return tuple(peers)
+
+
+# The 20 cells each cell shares a row, column or region with, built once
+# at import and shared by every board
+PEERS: Tuple[Tuple[int, ...], ...] = _build_peers()
+
+# Flat row-major cell indices of each kind of unit, shared by every board
+REGION_INDICES: Tuple[Tuple[int, ...], ...] = tuple(
+    tuple((r // 3 * 3 + i // 3) * 9 + r % 3 * 3 + i % 3 for i in range(9))
+    for r in range(9)
+)
+ROW_INDICES: Tuple[Tuple[int, ...], ...] = tuple(tuple(range(r * 9, r * 9 + 9)) for r in range(9))
+COLUMN_INDICES: Tuple[Tuple[int, ...], ...] = tuple(tuple(range(c, 81, 9)) for c in range(9))
+
+# All 27 units in the order propagation scans them
+UNITS: Tuple[Tuple[int, ...], ...] = REGION_INDICES + ROW_INDICES + COLUMN_INDICES
+
+# The three unit ids each cell belongs to, matching the UNITS order:
+# regions 0-8, rows 9-17, columns 18-26
+UNIT_IDS: Tuple[Tuple[int, int, int], ...] = tuple(
+    (i // 27 * 3 + i % 9 // 3, 9 + i // 9, 18 + i % 9) for i in range(81)
+)
+
+
+def propagate(values, cands, peers, units, worklist, dirty) -> int:
+    """Propagate every queued assignment until nothing changes.
+
+    The worklist holds indices of cells that became solved but whose
+    peers have not been updated yet. Each pop clears one bit in up to 20
+    peer masks; peers reduced to a single candidate are assigned and
+    re-queued, so work is proportional to actual changes rather than
+    board size. Every touched cell flags its three units in the dirty
+    set, and once the queue drains a hidden-single sweep runs over just
+    those units, refilling the queue if it assigns anything.
+
+    Returns the number of cells solved, so callers can keep a running
+    solved-cell count without rescanning the board.
+    """
+    # Bind everything the inner loops touch to locals; attribute and
+    # global lookups are not free at this call frequency
+    unit_ids = UNIT_IDS
+    bit_count = int.bit_count
+    popleft = worklist.popleft
+    enqueue = worklist.append
+    mark_dirty = dirty.update
+    solved = 0
+    while True:
+        while worklist:
+            i = popleft()
+            if not values[i]:  # Stale entry, e.g. left behind by an undo
+                continue
+            mark_dirty(unit_ids[i])
+            bit = cands[i]
+            for p in peers[i]:
+                if not values[p] and cands[p] & bit:
+                    mask = cands[p] & ~bit & 0x1FF
+                    cands[p] = mask
+                    mark_dirty(unit_ids[p])
+                    if bit_count(mask) == 1:
+                        values[p] = mask.bit_length()
+                        solved += 1
+                        enqueue(p)
+        if dirty:
+            sweep = [units[u] for u in dirty]
+            dirty.clear()
+            assigned = _hidden_singles(values, cands, sweep, worklist)
+            if assigned:
+                solved += assigned
+                continue
+        if worklist:
+            continue
+        # Cheaper deductions have stalled; look for naked pairs/triples
+        solved += _naked_sets(values, cands, units, worklist, dirty)
+        if not worklist and not dirty:
+            return solved
+
+
+def _hidden_singles(values, cands, units, worklist) -> int:
+    """Assign digits no other cell in a unit can take; count assignments."""
+    assigned = 0
+    enqueue = worklist.append
+    for unit in units:
+        # Fold the unit's masks into "seen at least once" / "seen at least
+        # twice"; digits in once & ~twice fit exactly one cell
+        once = twice = 0
+        for i in unit:
+            mask = cands[i]
+            twice |= once & mask
+            once |= mask
+        hidden = once & ~twice
+        if hidden:
+            for i in unit:
+                if not values[i]:
+                    unique = cands[i] & hidden
+                    if unique and unique & (unique - 1) == 0:
+                        values[i] = unique.bit_length()
+                        cands[i] = unique
+                        enqueue(i)
+                        assigned += 1
+    return assigned
+
+
+def _naked_sets(values, cands, units, worklist, dirty) -> int:
+    """Apply naked pair/triple eliminations; count any assignments made.
+
+    If k unsolved cells of a unit share one mask of k candidates, those
+    digits are locked to that group and can be cleared from every other
+    cell in the unit. Cells reduced to a single candidate are assigned
+    and queued; other eliminations flag their units for the next
+    hidden-single sweep.
+    """
+    unit_ids = UNIT_IDS
+    bit_count = int.bit_count
+    enqueue = worklist.append
+    mark_dirty = dirty.update
+    solved = 0
+    for unit in units:
+        counts = {}
+        for i in unit:
+            if not values[i]:
+                mask = cands[i]
+                counts[mask] = counts.get(mask, 0) + 1
+        for group, count in counts.items():
+            if count == bit_count(group) and 1 < count < 4:
+                for i in unit:
+                    if not values[i] and cands[i] != group and cands[i] & group:
+                        mask = cands[i] & ~group & 0x1FF
+                        cands[i] = mask
+                        mark_dirty(unit_ids[i])
+                        if bit_count(mask) == 1:
+                            values[i] = mask.bit_length()
+                            solved += 1
+                            enqueue(i)
+    return solved
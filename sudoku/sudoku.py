@@ -1,65 +1,107 @@
-from collections import Sequence
-from typing import List, Optional, Union, Dict
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Union, Dict, Tuple
+
+try:
+    from . import _core
+except ImportError:  # Imported as a plain module rather than part of a package
+    import _core
+
+# Flat row-major cell indices of each kind of unit, shared with the
+# propagation kernel
+_REGION_INDICES: Tuple[Tuple[int, ...], ...] = _core.REGION_INDICES
+_ROW_INDICES: Tuple[Tuple[int, ...], ...] = _core.ROW_INDICES
+_COLUMN_INDICES: Tuple[Tuple[int, ...], ...] = _core.COLUMN_INDICES
+
+# Blueprint arrays for an empty board, copied into each new instance
+_FRESH_VALUES: bytes = bytes(81)
+_FRESH_CANDS: array = array('H', [0x1FF] * 81)
+
+# Maps '.' (the other common blank marker) to '0'; whitespace is deleted
+# in the same translate pass
+_PARSE_TABLE: bytes = bytes.maketrans(b'.', b'0')
+
+# Display characters indexed by cell value, 0 rendering as a blank
+_DIGIT_CHARS: str = "-123456789"
 
 
 class _Cell:
-    __slots__ = ["__candidates", "__value", "__states"]
+    """Thin view over one slot of the board's flat value/candidate arrays."""
+
+    __slots__ = ["__board", "__index", "__cached_mask", "__cached_candidates"]
 
-    def __init__(self) -> None:
-        self.__candidates: List[bool] = [True, True, True, True, True, True, True, True, True]
-        self.__value: int = 0
-        self.__states: List[Dict] = [{"value": self.value, "candidates": self.candidates}]
+    def __init__(self, board: 'Board', index: int) -> None:
+        self.__board = board
+        self.__index: int = index
+        self.__cached_mask: int = -1
+        self.__cached_candidates: Tuple[int, ...] = ()
+
+    @property
+    def mask(self) -> int:
+        return self.__board._cands[self.__index]
 
     @property
-    def candidates(self) -> List[int]:
-        return [i+1 for i, c in enumerate(self.__candidates) if c]
+    def candidates(self) -> Tuple[int, ...]:
+        # Rebuilt only when the mask has changed since the last read, peeling
+        # one set bit per step instead of testing all nine positions
+        mask = self.__board._cands[self.__index]
+        if mask != self.__cached_mask:
+            self.__cached_mask = mask
+            digits = []
+            while mask:
+                bit = mask & -mask
+                digits.append(bit.bit_length())
+                mask ^= bit
+            self.__cached_candidates = tuple(digits)
+        return self.__cached_candidates
 
     @property
     def num_possible_values(self) -> int:
-        return len([candidate for candidate in self.candidates if candidate])
+        return self.__board._cands[self.__index].bit_count()
+
+    def iter_candidates(self) -> Iterator[int]:
+        # Yields candidate digits without materializing a tuple
+        mask = self.__board._cands[self.__index]
+        while mask:
+            bit = mask & -mask
+            yield bit.bit_length()
+            mask ^= bit
 
     def candidate(self, i: int) -> Optional[bool]:
         return self[i]
 
     def __getitem__(self, index: int) -> Optional[bool]:
-        return self.__candidates[index] if 0 <= index < 9 else None
+        return bool(self.__board._cands[self.__index] >> index & 1) if 0 <= index < 9 else None
 
     def __setitem__(self, index: int, value: bool) -> None:
         if 0 <= index < 9:
-            self.__states.append({"value": self.value, "candidates": self.candidates})
-            self.__candidates[index] = value
+            if value:
+                self.__board._cands[self.__index] |= 1 << index
+            else:
+                self.__board._cands[self.__index] &= ~(1 << index) & 0x1FF
+            self.__board._dirty.update(_core.UNIT_IDS[self.__index])
 
     def __eq__(self, other: '_Cell') -> bool:
-        return self.candidates == other.candidates
+        return self.mask == other.mask
 
     @property
     def value(self) -> int:
-        return self.__value
-
-    @property
-    def states(self) -> List[Dict]:
-        return self.__states
+        return self.__board._values[self.__index]
 
     @value.setter
     def value(self, value: int) -> None:
         if not (1 <= value <= 9):
             raise ValueError(f"Value of a cell must be between 1-9 (inclusive). Got {value}")
-        self.__states.append({"value": self.value, "candidates": self.candidates})
-        self.__value: int = value
-        self.__candidates: List[bool] = [False, False, False, False, False, False, False, False, False]
-        self.__candidates[value - 1]: bool = True
+        if not self.__board._values[self.__index]:
+            self.__board._solved += 1
+        self.__board._values[self.__index] = value
+        self.__board._cands[self.__index] = 1 << (value - 1)
+        self.__board._worklist.append(self.__index)
 
     def is_solved(self) -> bool:
         return self.value != 0
 
-    def rollback(self) -> None:
-        assert len(self.__states), "No further states to roll back to"
-        last_state = self.__states.pop()
-        self.__value = last_state["value"]
-        self.__candidates = [False, False, False, False, False, False, False, False, False]
-        for c in last_state["candidates"]:
-            self.__candidates[c-1] = True
-
     def __str__(self) -> str:
         return str(self.value) if self.value else "-"
 
@@ -68,17 +110,15 @@ class _Cell:
 
 
 class _Region:
-    __slots__ = ["__cells"]
+    __slots__ = ["__board", "__indices", "__cells"]
 
-    def __init__(self) -> None:
-        self.__cells: List[Optional[_Cell]] = [
-                                               _Cell(), _Cell(), _Cell(),
-                                               _Cell(), _Cell(), _Cell(),
-                                               _Cell(), _Cell(), _Cell(),
-                                               ]
+    def __init__(self, board: 'Board', indices: Tuple[int, ...], cells: Tuple[_Cell, ...]) -> None:
+        self.__board = board
+        self.__indices: Tuple[int, ...] = indices
+        self.__cells: Tuple[_Cell, ...] = cells
 
     @property
-    def cells(self) -> List[_Cell]:
+    def cells(self) -> Tuple[_Cell, ...]:
         return self.__cells
 
     def cell(self, i: int) -> Optional[_Cell]:
@@ -88,26 +128,31 @@ class _Region:
         return self.__cells[index] if 0 <= index < 9 else None
 
     def is_solved(self) -> bool:
-        return all([cell.is_solved() for cell in self.cells])
-
+        # Reads the flat value array directly; no generator or cell
+        # dispatch on what can be a per-iteration check for callers
+        values = self.__board._values
+        for i in self.__indices:
+            if not values[i]:
+                return False
+        return True
 
-class _Line(Sequence):
-    __slots__ = ["__cells"]
 
-    def __init__(self,  *cells: _Cell):
-        assert len(cells) == 9, "9 cells must be passed to create a full line"
-        assert all(isinstance(cell, _Cell) for cell in cells), "All cells passed to a line must be of instance Cell"
+class _Line:
+    __slots__ = ["__board", "__indices", "__cells"]
 
-        self.__cells: List[_Cell] = [*cells]
+    def __init__(self, board: 'Board', indices: Tuple[int, ...], cells: Tuple[_Cell, ...]) -> None:
+        self.__board = board
+        self.__indices: Tuple[int, ...] = indices
+        self.__cells: Tuple[_Cell, ...] = cells
 
     @property
-    def cells(self) -> List[_Cell]:
+    def cells(self) -> Tuple[_Cell, ...]:
         return self.__cells
 
     def cell(self, i: int) -> Optional[_Cell]:
         return self.__cells[i] if 0 <= i < 9 else None
 
-    def __len__(self) -> int:  # Required to be implemented by Sequence parent class
+    def __len__(self) -> int:
         return 9
 
     def __getitem__(self, splice: int) -> Union[_Cell, List[_Cell]]:
@@ -117,189 +162,238 @@ class _Line(Sequence):
         self.__cells[i].value = value
 
     def is_solved(self) -> bool:
-        return all([cell.is_solved() for cell in self.cells])
+        values = self.__board._values
+        for i in self.__indices:
+            if not values[i]:
+                return False
+        return True
 
 
 class Board:
-    __slots__ = ["__regions", "__rows", "__columns", "__states"]
+    __slots__ = ["_values", "_cands", "_worklist", "_dirty", "_solved", "__cells", "__regions", "__rows",
+                 "__columns", "__states"]
 
     def __init__(self, file: str = None) -> None:
-        self.__regions = [
-                          _Region(), _Region(), _Region(),
-                          _Region(), _Region(), _Region(),
-                          _Region(), _Region(), _Region(),
-                          ]
-
-        self.__rows: List[_Line] = [
-            _Line(self[0][0], self[0][1], self[0][2], self[1][0], self[1][1], self[1][2], self[2][0], self[2][1], self[2][2]),
-            _Line(self[0][3], self[0][4], self[0][5], self[1][3], self[1][4], self[1][5], self[2][3], self[2][4], self[2][5]),
-            _Line(self[0][6], self[0][7], self[0][8], self[1][6], self[1][7], self[1][8], self[2][6], self[2][7], self[2][8]),
-
-            _Line(self[3][0], self[3][1], self[3][2], self[4][0], self[4][1], self[4][2], self[5][0], self[5][1], self[5][2]),
-            _Line(self[3][3], self[3][4], self[3][5], self[4][3], self[4][4], self[4][5], self[5][3], self[5][4], self[5][5]),
-            _Line(self[3][6], self[3][7], self[3][8], self[4][6], self[4][7], self[4][8], self[5][6], self[5][7], self[5][8]),
-
-            _Line(self[6][0], self[6][1], self[6][2], self[7][0], self[7][1], self[7][2], self[8][0], self[8][1], self[8][2]),
-            _Line(self[6][3], self[6][4], self[6][5], self[7][3], self[7][4], self[7][5], self[8][3], self[8][4], self[8][5]),
-            _Line(self[6][6], self[6][7], self[6][8], self[7][6], self[7][7], self[7][8], self[8][6], self[8][7], self[8][8]),
-        ]
-
-        self.__columns: List[_Line] = [
-            _Line(self[0][0], self[0][3], self[0][6], self[3][0], self[3][3], self[3][6], self[6][0], self[6][3], self[6][6]),
-            _Line(self[0][1], self[0][4], self[0][7], self[3][1], self[3][4], self[3][7], self[6][1], self[6][4], self[6][7]),
-            _Line(self[0][2], self[0][5], self[0][8], self[3][2], self[3][5], self[3][8], self[6][2], self[6][5], self[6][8]),
-
-            _Line(self[1][0], self[1][3], self[1][6], self[4][0], self[4][3], self[4][6], self[7][0], self[7][3], self[7][6]),
-            _Line(self[1][1], self[1][4], self[1][7], self[4][1], self[4][4], self[4][7], self[7][1], self[7][4], self[7][7]),
-            _Line(self[1][2], self[1][5], self[1][8], self[4][2], self[4][5], self[4][8], self[7][2], self[7][5], self[7][8]),
-
-            _Line(self[2][0], self[2][3], self[2][6], self[5][0], self[5][3], self[5][6], self[8][0], self[8][3], self[8][6]),
-            _Line(self[2][1], self[2][4], self[2][7], self[5][1], self[5][4], self[5][7], self[8][1], self[8][4], self[8][7]),
-            _Line(self[2][2], self[2][5], self[2][8], self[5][2], self[5][5], self[5][8], self[8][2], self[8][5], self[8][8]),
-        ]
+        # Structure-of-arrays storage: one flat value per cell and one flat
+        # 9-bit candidate mask per cell, indexed row-major (index = row*9 + column)
+        self._values: bytearray = bytearray(_FRESH_VALUES)
+        self._cands: array = _FRESH_CANDS[:]
+        # Solved cells whose peers still need their candidates pruned, and
+        # units touched since the last hidden-single sweep
+        self._worklist: deque = deque()
+        self._dirty: set = set()
+        # Count of solved cells, kept current by every assignment path
+        self._solved: int = 0
+
+        # Cell, region and line views are only needed by callers that poke at
+        # individual cells, so they are built lazily on first access
+        self.__cells: Optional[Tuple[_Cell, ...]] = None
+        self.__regions: Optional[Tuple[_Region, ...]] = None
+        self.__rows: Optional[Tuple[_Line, ...]] = None
+        self.__columns: Optional[Tuple[_Line, ...]] = None
+
         if file:
             self.parse(file=file)
 
         self.__states = []
 
+    def __ensure_views(self) -> None:
+        if self.__cells is None:
+            self.__cells = tuple(_Cell(self, i) for i in range(81))
+            self.__regions = tuple(_Region(self, unit, tuple(self.__cells[i] for i in unit))
+                                   for unit in _REGION_INDICES)
+            self.__rows = tuple(_Line(self, unit, tuple(self.__cells[i] for i in unit))
+                                for unit in _ROW_INDICES)
+            self.__columns = tuple(_Line(self, unit, tuple(self.__cells[i] for i in unit))
+                                   for unit in _COLUMN_INDICES)
+
     def __getitem__(self, i: int) -> Optional[_Region]:
-        return self.__regions[i] if 0 <= i < 9 else None
+        return self.regions[i] if 0 <= i < 9 else None
 
     @property
-    def regions(self) -> List[_Region]:
+    def regions(self) -> Tuple[_Region, ...]:
+        self.__ensure_views()
         return self.__regions
 
     def region(self, i: int) -> Optional[_Region]:
         return self[i]
 
     @property
-    def rows(self) -> List[_Line]:
+    def rows(self) -> Tuple[_Line, ...]:
+        self.__ensure_views()
         return self.__rows
 
     def row(self, i: int) -> _Line:
-        return self.__rows[i]
+        return self.rows[i]
 
     @property
-    def columns(self) -> List[_Line]:
+    def columns(self) -> Tuple[_Line, ...]:
+        self.__ensure_views()
         return self.__columns
 
     def column(self, i: int) -> _Line:
-        return self.__columns[i]
+        return self.columns[i]
 
     def parse(self, file: str = None) -> None:
-        with open(file) as sudoku_challenge:
-            for i, row in enumerate(sudoku_challenge):
-                row = row.strip()
-                for j, value in enumerate(row):
-                    value = int(value)
-                    if value:
-                        self.row(i).cell(j).value = value
+        with open(file, 'rb') as sudoku_challenge:
+            self._load(sudoku_challenge.read())
+
+    def _load(self, grid: bytes) -> None:
+        digits = grid.translate(_PARSE_TABLE, b' \t\r\n')
+        values, cands = self._values, self._cands
+        for i in range(81):
+            value = digits[i] - 48  # ord('0')
+            if value:
+                values[i] = value
+                cands[i] = 1 << (value - 1)
+                self._solved += 1
+                self._worklist.append(i)
 
     def __str__(self) -> str:
-        ret: str = ""
-        for i, row in enumerate(self.rows):
-            if i and not i % 3:
-                ret += '-' * 21
-                ret += "\n"
-            ret += " ".join(map(str, row[:3]))
-            ret += " | "
-            ret += " ".join(map(str, row[3:6]))
-            ret += " | "
-            ret += " ".join(map(str, row[6:9]))
-            ret += "\n"
-        return ret
+        chars = [_DIGIT_CHARS[v] for v in self._values]
+        lines: List[str] = []
+        for r in range(0, 81, 9):
+            if r and not r % 27:
+                lines.append('-' * 21)
+            row = chars[r:r+9]
+            lines.append(" | ".join(" ".join(row[k:k+3]) for k in (0, 3, 6)))
+        lines.append("")
+        return "\n".join(lines)
 
     def draw(self) -> None:
         print(str(self))
 
-    @staticmethod
-    def __remove_candidates(areas):
-        cells_changed = []
-        for area in areas:
-            if area.is_solved():
-                continue
-            for i, sub_cell in enumerate(area.cells):
-                if sub_cell.value:
-                    for j, sub_cell2 in enumerate(area.cells):
-                        if i == j:  # Don't compare the same cell to itself
-                            continue
-                        if not sub_cell2.value and sub_cell2[sub_cell.value-1]:
-                            sub_cell2[sub_cell.value-1] = False
-                            cells_changed.append(sub_cell2)
-        return cells_changed
-
-    @staticmethod
-    def __remove_singularity(areas):
-        cells_changed = []
-        for area in areas:
-            if area.is_solved():
-                continue
-            for i, sub_cell in enumerate(area.cells):
-                if not sub_cell.value:
-                    for j, candidate in enumerate(sub_cell.candidates):
-                        if i == j:  # Don't compare the same cell to itself
-                            continue
-                        singular = True
-                        for sub_cell2 in area.cells:
-                            if sub_cell2.value == candidate or not sub_cell2.value and sub_cell2[candidate-1]:
-                                singular = False
-                                break
-                        if singular:
-                            sub_cell.value = candidate
-                            cells_changed.append(sub_cell)
-        return cells_changed
-
-    @staticmethod
-    def __validate_areas(areas):
-        for area in areas:
-            values = [cell.value for cell in area.cells if cell.value != 0]
-            if len(values) != len(set(values)):
-                return False
-        return True
-
     def update(self) -> None:
         if self.is_solved():  # Nothing to update
             return None
 
-        cells_changed = []
-
-        cells_changed.extend(self.__remove_candidates(self.regions))
-        cells_changed.extend(self.__remove_candidates(self.rows))
-        cells_changed.extend(self.__remove_candidates(self.columns))
-
-        # Set value if only 1 candidate
-        for region in self.regions:
-            if region.is_solved():
-                continue
-            for cell in region.cells:
-                if cell.num_possible_values == 1:
-                    cell.value = cell.candidates[0]
-                    cells_changed.append(cell)
-
-        # Singularity in region
-        cells_changed.extend(self.__remove_singularity(self.regions))
-        cells_changed.extend(self.__remove_singularity(self.rows))
-        cells_changed.extend(self.__remove_singularity(self.columns))
-
-        self.__states.append(cells_changed)
+        state = self._snapshot()
+        self._solved += _core.propagate(self._values, self._cands, _core.PEERS, _core.UNITS, self._worklist,
+                                        self._dirty)
+        self.__states.append(state)
 
     def validate(self) -> bool:
-        return self.__validate_areas(self.regions) \
-               and self.__validate_areas(self.rows) \
-               and self.__validate_areas(self.columns)
-
-    def solve(self) -> None:
-        pass
+        values = self._values
+        for unit in _core.UNITS:
+            seen = 0
+            for i in unit:
+                value = values[i]
+                if value:
+                    bit = 1 << value
+                    if seen & bit:  # Digit already placed in this unit
+                        return False
+                    seen |= bit
+        return True
 
-    def brute_force(self) -> None:
-        pass
+    def solve(self) -> bool:
+        """Solve by propagation plus backtracking; undo() reverts a solve."""
+        state = self._snapshot()
+        if self.__search():
+            self.__states.append(state)
+            return True
+        self._restore(state)
+        return False
+
+    def __search(self) -> bool:
+        values, cands = self._values, self._cands
+        self._solved += _core.propagate(values, cands, _core.PEERS, _core.UNITS, self._worklist, self._dirty)
+
+        # Branch on the unsolved cell with the fewest candidates left
+        best, best_count = -1, 10
+        bit_count = int.bit_count
+        for i in range(81):
+            if not values[i]:
+                count = bit_count(cands[i])
+                if count == 0:  # Contradiction: a cell with nothing left to try
+                    return False
+                if count < best_count:
+                    best, best_count = i, count
+        if best < 0:
+            return self.validate()
+
+        mask = cands[best]
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            state = self._snapshot()
+            values[best] = bit.bit_length()
+            cands[best] = bit
+            self._solved += 1
+            self._worklist.append(best)
+            if self.__search():
+                return True
+            self._restore(state)
+        return False
+
+    def brute_force(self) -> bool:
+        """Plain depth-first search with no propagation or ordering heuristics."""
+        state = self._snapshot()
+        if self.__brute(0) and self.validate():
+            for i, value in enumerate(self._values):
+                self._cands[i] = 1 << (value - 1)
+            self._solved = 81
+            self.__states.append(state)
+            return True
+        self._restore(state)
+        return False
+
+    def __brute(self, start: int) -> bool:
+        values = self._values
+        i = start
+        while i < 81 and values[i]:
+            i += 1
+        if i == 81:
+            return True
+        peers = _core.PEERS[i]
+        for digit in range(1, 10):
+            if all(values[p] != digit for p in peers):
+                values[i] = digit
+                if self.__brute(i + 1):
+                    return True
+                values[i] = 0
+        return False
+
+    @classmethod
+    def solve_many(cls, puzzles: Iterable[str], workers: int = None) -> List[str]:
+        """Solve a batch of puzzles across processes; returns board strings.
+
+        Each entry is either a file path or an inline 81-digit grid (the
+        usual one-line benchmark format, '.' or '0' for blanks), so large
+        collections can be dispatched without writing a file per puzzle.
+        Individual puzzles solve in well under a millisecond, so work is
+        handed out in chunks to keep submission overhead from dominating.
+        """
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(_solve_one, puzzles, chunksize=64))
 
     def is_solved(self) -> bool:
-        return all([region.is_solved() for region in self.regions])
+        return self._solved == 81
+
+    def _snapshot(self) -> Tuple[bytes, array, int]:
+        return bytes(self._values), self._cands[:], self._solved
+
+    def _restore(self, state: Tuple[bytes, array, int]) -> None:
+        self._values[:] = state[0]
+        self._cands[:] = state[1]
+        self._solved = state[2]
+        # Queued indices refer to the discarded state; re-seed from the
+        # restored one so the next update can prune peers again
+        self._worklist.clear()
+        self._worklist.extend(i for i in range(81) if state[0][i])
 
     def undo(self):
         if not self.__states:
             return "Nothing to revert back to"
-        last_state = self.__states.pop()
-        for cell in last_state:
-            cell.rollback()
+        self._restore(self.__states.pop())
+
+
+def _solve_one(puzzle: str) -> str:
+    # Module-level so ProcessPoolExecutor workers can pickle it by name
+    grid = puzzle.encode().translate(_PARSE_TABLE, b' \t\r\n')
+    board = Board()
+    if len(grid) == 81 and grid.isdigit():
+        board._load(grid)
+    else:
+        board.parse(file=puzzle)
+    board.solve()
+    return str(board)